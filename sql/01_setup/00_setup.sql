@@ -17,6 +17,7 @@
  *   - SFE_STREAMLIT_STAGE (Stage for dashboard files)
  *   - SFE_COST_PARAMS (Table for cost calculation parameters)
  *   - SFE_ESTIMATE_WH_COST (Function for cost estimation)
+ *   - SFE_QUERY_TAGS (View of query history with parsed query tags)
  * 
  * PREREQUISITES:
  *   - ACCOUNTADMIN role or CREATE DATABASE/WAREHOUSE privileges
@@ -120,6 +121,37 @@ $$;
 --   ALTER SESSION SET QUERY_TAG = 'WORKLOAD:DATA_PREP';
 -- Query tags are automatically captured in ACCOUNT_USAGE.QUERY_HISTORY for cost analysis
 
+-- 7a. Query history with parsed query tags
+-- Defines the tag parsing in one place so monitoring queries share a single definition.
+-- This is a plain view: REGEXP_SUBSTR still runs on every row each time it is queried.
+-- Matches the recognized values as prefixes, like LIKE '%WORKLOAD:TRAINING%' did, so
+-- WORKLOAD:TRAINING_V2 is still TRAINING; anything else is UNTAGGED (workload) or OTHER (path).
+CREATE OR REPLACE VIEW SNOWFLAKE_EXAMPLE.FORECASTING.SFE_QUERY_TAGS
+    COMMENT = 'ACCOUNT_USAGE.QUERY_HISTORY with workload_type and model_path parsed from query tags'
+AS
+SELECT
+    -- Explicit columns keep the view valid when Snowflake adds QUERY_HISTORY columns
+    -- and avoid exposing query_text through the demo schema
+    qh.query_id,
+    qh.query_tag,
+    qh.user_name,
+    qh.warehouse_name,
+    qh.start_time,
+    qh.execution_status,
+    qh.total_elapsed_time,
+    qh.queued_overload_time,
+    qh.bytes_scanned,
+    qh.rows_produced,
+    COALESCE(
+        REGEXP_SUBSTR(qh.query_tag, 'WORKLOAD:(TRAINING|INFERENCE|DATA_PREP)', 1, 1, 'e', 1),
+        'UNTAGGED'
+    ) AS workload_type,
+    COALESCE(
+        REGEXP_SUBSTR(qh.query_tag, 'PATH:(ML_FUNCTIONS|SNOWPARK_XGBOOST)', 1, 1, 'e', 1),
+        'OTHER'
+    ) AS model_path
+FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY qh;
+
 -- 8. Optional: Resource monitors for cost control
 -- Resource monitors prevent runaway costs by setting credit quotas on warehouses
 -- Uncomment and customize the following example to enable budget controls:
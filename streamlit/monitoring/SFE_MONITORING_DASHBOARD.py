@@ -10,11 +10,13 @@ To deploy: Run the SQL deployment script in streamlit/monitoring/deploy_streamli
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from snowflake.snowpark.context import get_active_session
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.compute as pc
+from datetime import datetime, timedelta, timezone
 
 # Page configuration
 st.set_page_config(
@@ -44,18 +46,54 @@ st.markdown("""
 # Get Snowflake session (automatically available in Streamlit in Snowflake)
 session = get_active_session()
 
-@st.cache_data(ttl=300)
-def fetch_data(query):
-    """Execute query and return DataFrame with 5-minute cache"""
-    try:
-        return session.sql(query).to_pandas()
-    except Exception as e:
-        st.error(f"Error fetching data: {str(e)}")
-        return pd.DataFrame()
+def downcast_numeric(tbl):
+    """Narrow int64 columns to int32 where their range fits
+
+    Floats stay float64: float32 values serialize to longer JSON in Plotly and would
+    alter values used in calculations (e.g. cost parameters).
+    """
+    fields = []
+    for field, column in zip(tbl.schema, tbl.columns):
+        if pa.types.is_int64(field.type):
+            bounds = pc.min_max(column)
+            low, high = bounds['min'].as_py(), bounds['max'].as_py()
+            if low is None or (low >= -2**31 and high < 2**31):
+                field = field.with_type(pa.int32())
+        fields.append(field)
+    return tbl.cast(pa.schema(fields, metadata=tbl.schema.metadata))
+
+def to_pandas(df):
+    """Materialize a Snowpark DataFrame via Arrow, keeping Arrow-backed dtypes"""
+    # DataFrame.to_arrow() was added in Snowpark 1.28; older runtimes use the pandas fetch
+    if not hasattr(df, 'to_arrow'):
+        return df.to_pandas()
+    return downcast_numeric(df.to_arrow()).to_pandas(types_mapper=pd.ArrowDtype)
+
+# ACCOUNT_USAGE views lag by up to 45 minutes, so results are cached for 30 minutes.
+# Caching is applied per get_* function so the cache key is (function, arguments)
+# rather than the full SQL text.
+ACCOUNT_USAGE_TTL = 1800
+
+def fetch_data(query, params=None):
+    """Execute query with optional bind parameters and return DataFrame
+
+    Errors propagate so the cached get_* callers never cache a failed fetch;
+    they are reported by fetch_concurrently and main().
+    """
+    return to_pandas(session.sql(query, params=params))
+
+def window_start(days):
+    """Start of the time window as an hour-aligned UTC timestamp for binding"""
+    # A literal bound keeps start_time free of expressions so partitions can be pruned;
+    # aligning to the hour keeps the bound value (and cache keys) stable between reruns
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return (now - timedelta(days=days)).isoformat()
 
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
 def get_warehouse_metrics(days=7):
     """Fetch warehouse utilization metrics"""
-    query = f"""
+    start = window_start(days)
+    query = """
     SELECT
         warehouse_name,
         DATE_TRUNC('hour', start_time) AS hour,
@@ -63,15 +101,17 @@ def get_warehouse_metrics(days=7):
         COUNT(*) AS execution_count
     FROM SNOWFLAKE.ACCOUNT_USAGE.WAREHOUSE_METERING_HISTORY
     WHERE warehouse_name = 'SFE_SP_WH'
-      AND start_time >= DATEADD(day, -{days}, CURRENT_TIMESTAMP())
+      AND start_time >= ?::TIMESTAMP_TZ
     GROUP BY warehouse_name, DATE_TRUNC('hour', start_time)
     ORDER BY hour
     """
-    return fetch_data(query)
+    return fetch_data(query, params=[start])
 
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
 def get_warehouse_load(days=7):
     """Fetch warehouse load history for queuing detection"""
-    query = f"""
+    start = window_start(days)
+    query = """
     SELECT
         start_time,
         end_time,
@@ -81,94 +121,182 @@ def get_warehouse_load(days=7):
         avg_blocked
     FROM SNOWFLAKE.ACCOUNT_USAGE.WAREHOUSE_LOAD_HISTORY
     WHERE warehouse_name = 'SFE_SP_WH'
-      AND start_time >= DATEADD(day, -{days}, CURRENT_TIMESTAMP())
+      AND start_time >= ?::TIMESTAMP_TZ
     ORDER BY start_time
     """
-    return fetch_data(query)
+    return fetch_data(query, params=[start])
 
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
 def get_cost_by_workload(days=7):
     """Fetch cost attribution by workload type"""
-    query = f"""
-    WITH tagged_queries AS (
+    # Credits are metered per hour, so each query is charged its share of the
+    # hour's elapsed time rather than joined row-for-row against metering history
+    start = window_start(days)
+    query = """
+    WITH hourly_credits AS (
         SELECT
-            qh.query_id,
-            qh.query_tag,
-            qh.total_elapsed_time / 1000 AS execution_time_seconds,
-            wmh.credits_used,
-            CASE
-                WHEN qh.query_tag LIKE '%WORKLOAD:TRAINING%' THEN 'TRAINING'
-                WHEN qh.query_tag LIKE '%WORKLOAD:INFERENCE%' THEN 'INFERENCE'
-                WHEN qh.query_tag LIKE '%WORKLOAD:DATA_PREP%' THEN 'DATA_PREP'
-                ELSE 'UNTAGGED'
-            END AS workload_type,
-            CASE
-                WHEN qh.query_tag LIKE '%PATH:ML_FUNCTIONS%' THEN 'ML_FUNCTIONS'
-                WHEN qh.query_tag LIKE '%PATH:SNOWPARK_XGBOOST%' THEN 'SNOWPARK_XGBOOST'
-                ELSE 'OTHER'
-            END AS model_path
-        FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY qh
-        LEFT JOIN SNOWFLAKE.ACCOUNT_USAGE.WAREHOUSE_METERING_HISTORY wmh
-            ON qh.warehouse_name = wmh.warehouse_name
-            AND DATE_TRUNC('hour', qh.start_time) = DATE_TRUNC('hour', wmh.start_time)
-        WHERE qh.warehouse_name = 'SFE_SP_WH'
-          AND qh.start_time >= DATEADD(day, -{days}, CURRENT_TIMESTAMP())
-          AND qh.execution_status = 'SUCCESS'
+            DATE_TRUNC('hour', start_time) AS hour,
+            SUM(credits_used) AS credits_used
+        FROM SNOWFLAKE.ACCOUNT_USAGE.WAREHOUSE_METERING_HISTORY
+        WHERE warehouse_name = 'SFE_SP_WH'
+          AND start_time >= ?::TIMESTAMP_TZ
+        GROUP BY DATE_TRUNC('hour', start_time)
+    ),
+    tagged_queries AS (
+        SELECT
+            query_id,
+            query_tag,
+            DATE_TRUNC('hour', start_time) AS hour,
+            total_elapsed_time / 1000 AS execution_time_seconds,
+            total_elapsed_time / NULLIF(
+                SUM(total_elapsed_time) OVER (PARTITION BY DATE_TRUNC('hour', start_time)), 0
+            ) AS hour_share,
+            workload_type,
+            model_path
+        FROM SNOWFLAKE_EXAMPLE.FORECASTING.SFE_QUERY_TAGS
+        WHERE warehouse_name = 'SFE_SP_WH'
+          AND start_time >= ?::TIMESTAMP_TZ
+          AND execution_status = 'SUCCESS'
     )
     SELECT
-        workload_type,
-        model_path,
-        COUNT(DISTINCT query_id) AS query_count,
-        SUM(execution_time_seconds) / 3600 AS total_execution_hours,
-        SUM(credits_used) AS total_credits
-    FROM tagged_queries
-    GROUP BY workload_type, model_path
+        q.workload_type,
+        q.model_path,
+        COUNT(*) AS query_count,
+        SUM(q.execution_time_seconds) / 3600 AS total_execution_hours,
+        SUM(q.hour_share * h.credits_used) AS total_credits
+    FROM tagged_queries q
+    LEFT JOIN hourly_credits h
+        ON q.hour = h.hour
+    GROUP BY q.workload_type, q.model_path
     ORDER BY total_credits DESC
     """
-    return fetch_data(query)
+    return fetch_data(query, params=[start, start])
 
-def get_query_performance(days=7):
-    """Fetch query performance metrics"""
-    query = f"""
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
+def get_queued_queries(days=7):
+    """Fetch the columns for the queue analysis table among the 100 slowest queries"""
+    start = window_start(days)
+    query = """
     SELECT
         query_id,
-        query_tag,
-        user_name,
-        start_time,
+        workload_type,
         total_elapsed_time / 1000 AS execution_time_seconds,
-        queued_overload_time / 1000 AS queue_time_seconds,
-        bytes_scanned / POWER(1024, 3) AS gb_scanned,
-        rows_produced,
-        CASE
-            WHEN query_tag LIKE '%WORKLOAD:TRAINING%' THEN 'TRAINING'
-            WHEN query_tag LIKE '%WORKLOAD:INFERENCE%' THEN 'INFERENCE'
-            WHEN query_tag LIKE '%WORKLOAD:DATA_PREP%' THEN 'DATA_PREP'
-            ELSE 'OTHER'
-        END AS workload_type
-    FROM SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY
+        queued_overload_time / 1000 AS queue_time_seconds
+    FROM SNOWFLAKE_EXAMPLE.FORECASTING.SFE_QUERY_TAGS
     WHERE warehouse_name = 'SFE_SP_WH'
-      AND start_time >= DATEADD(day, -{days}, CURRENT_TIMESTAMP())
+      AND start_time >= ?::TIMESTAMP_TZ
       AND execution_status = 'SUCCESS'
     ORDER BY total_elapsed_time DESC
     LIMIT 100
     """
-    return fetch_data(query)
+    return fetch_data(query, params=[start])
+
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
+def get_top_slow_queries(days=7, k=10):
+    """Fetch the k slowest queries"""
+    start = window_start(days)
+    query = """
+    SELECT
+        query_id,
+        total_elapsed_time / 1000 AS execution_time_seconds,
+        workload_type
+    FROM SNOWFLAKE_EXAMPLE.FORECASTING.SFE_QUERY_TAGS
+    WHERE warehouse_name = 'SFE_SP_WH'
+      AND start_time >= ?::TIMESTAMP_TZ
+      AND execution_status = 'SUCCESS'
+    ORDER BY total_elapsed_time DESC
+    LIMIT ?
+    """
+    return fetch_data(query, params=[start, k])
+
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
+def get_query_perf_summary(days=7):
+    """Fetch query performance statistics aggregated by workload type"""
+    start = window_start(days)
+    query = """
+    WITH perf AS (
+        SELECT
+            total_elapsed_time / 1000 AS execution_time_seconds,
+            bytes_scanned / POWER(1024, 3) AS gb_scanned,
+            workload_type
+        FROM SNOWFLAKE_EXAMPLE.FORECASTING.SFE_QUERY_TAGS
+        WHERE warehouse_name = 'SFE_SP_WH'
+          AND start_time >= ?::TIMESTAMP_TZ
+          AND execution_status = 'SUCCESS'
+    )
+    SELECT
+        workload_type,
+        ROUND(AVG(execution_time_seconds), 2) AS avg_time_seconds,
+        ROUND(MEDIAN(execution_time_seconds), 2) AS median_time_seconds,
+        ROUND(MAX(execution_time_seconds), 2) AS max_time_seconds,
+        ROUND(SUM(gb_scanned), 2) AS total_gb_scanned,
+        COUNT(*) AS query_count,
+        COUNT_IF(execution_time_seconds > 300) AS slow_query_count
+    FROM perf
+    GROUP BY workload_type
+    ORDER BY workload_type
+    """
+    return fetch_data(query, params=[start])
 
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
+def get_exec_time_histogram(days=7, bins=30):
+    """Fetch execution time histogram counts by workload type, binned in SQL"""
+    start = window_start(days)
+    query = """
+    WITH exec_times AS (
+        SELECT
+            workload_type,
+            total_elapsed_time / 1000 AS execution_time_seconds
+        FROM SNOWFLAKE_EXAMPLE.FORECASTING.SFE_QUERY_TAGS
+        WHERE warehouse_name = 'SFE_SP_WH'
+          AND start_time >= ?::TIMESTAMP_TZ
+          AND execution_status = 'SUCCESS'
+    ),
+    bounds AS (
+        SELECT GREATEST(MAX(execution_time_seconds), 1) AS max_exec
+        FROM exec_times
+    ),
+    bucketed AS (
+        SELECT
+            e.workload_type,
+            -- WIDTH_BUCKET puts the maximum itself in overflow bucket bins + 1
+            LEAST(WIDTH_BUCKET(e.execution_time_seconds, 0, b.max_exec, ?), ?) AS bucket,
+            b.max_exec / ? AS bucket_width
+        FROM exec_times e
+        CROSS JOIN bounds b
+    )
+    SELECT
+        workload_type,
+        (bucket - 1) * bucket_width AS bucket_start_seconds,
+        bucket_width AS bucket_width_seconds,
+        COUNT(*) AS query_count
+    FROM bucketed
+    GROUP BY workload_type, bucket, bucket_width
+    ORDER BY workload_type, bucket
+    """
+    return fetch_data(query, params=[start, bins, bins, bins])
+
+@st.cache_data(ttl=ACCOUNT_USAGE_TTL, show_spinner=False)
 def get_daily_costs(days=30):
     """Fetch daily cost trends"""
-    query = f"""
+    start = window_start(days)
+    query = """
     SELECT
         DATE_TRUNC('day', start_time) AS date,
         SUM(credits_used) AS daily_credits
     FROM SNOWFLAKE.ACCOUNT_USAGE.WAREHOUSE_METERING_HISTORY
     WHERE warehouse_name = 'SFE_SP_WH'
-      AND start_time >= DATEADD(day, -{days}, CURRENT_TIMESTAMP())
+      AND start_time >= ?::TIMESTAMP_TZ
     GROUP BY DATE_TRUNC('day', start_time)
     ORDER BY date
     """
-    return fetch_data(query)
+    return fetch_data(query, params=[start])
 
+DEFAULT_COST_PARAMS = {'DOLLARS_PER_CREDIT': 3.0, 'SP_WH_MEDIUM_CREDITS_PER_HOUR': 6.0}
+
+@st.cache_data(ttl=86400, show_spinner=False)
 def get_cost_params():
-    """Fetch cost parameters"""
+    """Fetch cost parameters (rarely change, so cached for 24 hours)"""
     query = """
     SELECT param_name, param_value 
     FROM SNOWFLAKE_EXAMPLE.FORECASTING.SFE_COST_PARAMS
@@ -176,7 +304,30 @@ def get_cost_params():
     df = fetch_data(query)
     if not df.empty:
         return dict(zip(df['PARAM_NAME'], df['PARAM_VALUE']))
-    return {'DOLLARS_PER_CREDIT': 3.0, 'SP_WH_MEDIUM_CREDITS_PER_HOUR': 6.0}
+    return DEFAULT_COST_PARAMS
+
+# The dashboard runs on SFE_SP_WH, the warehouse it monitors, so only a few
+# queries are issued at once to avoid queueing behind (and skewing) the workloads.
+FETCH_WORKERS = 4
+
+def fetch_concurrently(fetchers):
+    """Run independent fetch functions in parallel and return their results by name
+
+    fetchers maps a result name to a (function, *args) tuple. Worker threads share
+    the script run context so cached functions behave as on the main thread. A failed
+    fetch is reported with st.error and yields an empty DataFrame.
+    """
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(fetchers)), initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+        futures = {name: executor.submit(fn, *args) for name, (fn, *args) in fetchers.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                st.error(f"Error fetching data: {str(e)}")
+                results[name] = pd.DataFrame()
+        return results
 
 # ============================================================================
 # MAIN APPLICATION
@@ -194,8 +345,16 @@ def main():
         index=0
     )
     
+    # Cached results outlive ACCOUNT_USAGE refreshes; let users force a re-query
+    if st.sidebar.button("🔄 Refresh Data"):
+        st.cache_data.clear()
+    
     # Fetch cost parameters
-    cost_params = get_cost_params()
+    try:
+        cost_params = get_cost_params()
+    except Exception as e:
+        st.error(f"Error fetching data: {str(e)}")
+        cost_params = DEFAULT_COST_PARAMS
     dollars_per_credit = cost_params.get('DOLLARS_PER_CREDIT', 3.0)
     
     st.sidebar.markdown("---")
@@ -205,6 +364,18 @@ def main():
     st.sidebar.markdown("**About**")
     st.sidebar.info("This dashboard monitors the SFE_SP_WH warehouse used for forecasting workloads.")
     
+    # The queries behind each tab are independent, so issue them concurrently
+    data = fetch_concurrently({
+        'wh_metrics': (get_warehouse_metrics, time_window),
+        'wh_load': (get_warehouse_load, time_window),
+        'cost_by_workload': (get_cost_by_workload, time_window),
+        'daily_costs': (get_daily_costs, min(time_window, 30)),
+        'top_slow': (get_top_slow_queries, time_window, 10),
+        'perf_summary': (get_query_perf_summary, time_window),
+        'exec_histogram': (get_exec_time_histogram, time_window),
+        'queue_times': (get_queued_queries, time_window),
+    })
+    
     # Create tabs
     tab1, tab2, tab3, tab4 = st.tabs([
         "🏭 Warehouse Performance", 
@@ -219,11 +390,11 @@ def main():
     with tab1:
         st.header("Warehouse Performance Overview")
         
-        # Fetch warehouse metrics
-        wh_metrics = get_warehouse_metrics(time_window)
-        wh_load = get_warehouse_load(time_window)
+        wh_metrics = data['wh_metrics']
+        wh_load = data['wh_load']
         
         if not wh_metrics.empty:
+            import plotly.graph_objects as go
             # Summary metrics
             col1, col2, col3, col4 = st.columns(4)
             
@@ -245,14 +416,18 @@ def main():
             
             # Credit usage over time
             st.subheader("Credit Usage Over Time")
-            fig_credits = px.line(
-                wh_metrics, 
-                x='HOUR', 
-                y='TOTAL_CREDITS',
+            fig_credits = go.Figure(go.Scatter(
+                x=wh_metrics['HOUR'].to_numpy(),
+                y=wh_metrics['TOTAL_CREDITS'].to_numpy(),
+                name='Credits Used',
+                mode='lines'
+            ))
+            fig_credits.update_layout(
                 title='Hourly Credit Consumption',
-                labels={'HOUR': 'Time', 'TOTAL_CREDITS': 'Credits Used'}
+                xaxis_title='Time',
+                yaxis_title='Credits Used',
+                height=400
             )
-            fig_credits.update_layout(height=400)
             st.plotly_chart(fig_credits, use_container_width=True)
             
             # Warehouse load analysis
@@ -297,11 +472,11 @@ def main():
     with tab2:
         st.header("Cost Analytics & Attribution")
         
-        # Fetch cost data
-        cost_by_workload = get_cost_by_workload(time_window)
-        daily_costs = get_daily_costs(min(time_window, 30))
+        cost_by_workload = data['cost_by_workload']
+        daily_costs = data['daily_costs']
         
         if not cost_by_workload.empty:
+            import plotly.express as px
             # Add cost column
             cost_by_workload['ESTIMATED_COST'] = cost_by_workload['TOTAL_CREDITS'] * dollars_per_credit
             
@@ -357,6 +532,7 @@ def main():
         
         # Daily cost trend
         if not daily_costs.empty:
+            import plotly.express as px
             st.markdown("---")
             st.subheader("Daily Cost Trend")
             daily_costs['DAILY_COST'] = daily_costs['DAILY_CREDITS'] * dollars_per_credit
@@ -387,12 +563,12 @@ def main():
     with tab3:
         st.header("Query Performance Analysis")
         
-        query_perf = get_query_performance(time_window)
+        top_slow = data['top_slow']
         
-        if not query_perf.empty:
+        if not top_slow.empty:
+            import plotly.express as px
             # Top slowest queries
             st.subheader("Slowest Queries")
-            top_slow = query_perf.nlargest(10, 'EXECUTION_TIME_SECONDS')
             
             fig_slow = px.bar(
                 top_slow,
@@ -409,35 +585,44 @@ def main():
             
             # Performance by workload type
             st.subheader("Performance by Workload Type")
-            perf_summary = query_perf.groupby('WORKLOAD_TYPE').agg({
-                'EXECUTION_TIME_SECONDS': ['mean', 'median', 'max'],
-                'GB_SCANNED': 'sum',
-                'QUERY_ID': 'count'
-            }).round(2)
-            perf_summary.columns = ['Avg Time (s)', 'Median Time (s)', 'Max Time (s)', 'Total GB Scanned', 'Query Count']
-            st.dataframe(perf_summary, use_container_width=True)
+            perf_summary = data['perf_summary']
+            if not perf_summary.empty:
+                perf_summary = perf_summary.drop(columns='SLOW_QUERY_COUNT').set_index('WORKLOAD_TYPE')
+                perf_summary.columns = ['Avg Time (s)', 'Median Time (s)', 'Max Time (s)', 'Total GB Scanned', 'Query Count']
+                st.dataframe(perf_summary, use_container_width=True)
             
             st.markdown("---")
             
             # Execution time distribution
             st.subheader("Query Execution Time Distribution")
-            fig_dist = px.histogram(
-                query_perf,
-                x='EXECUTION_TIME_SECONDS',
-                color='WORKLOAD_TYPE',
-                title='Execution Time Distribution',
-                labels={'EXECUTION_TIME_SECONDS': 'Execution Time (s)'},
-                nbins=30
-            )
-            fig_dist.update_layout(height=400)
-            st.plotly_chart(fig_dist, use_container_width=True)
+            exec_histogram = data['exec_histogram']
+            if not exec_histogram.empty:
+                import plotly.graph_objects as go
+                fig_dist = go.Figure()
+                for workload_type, buckets in exec_histogram.groupby('WORKLOAD_TYPE'):
+                    bucket_width = buckets['BUCKET_WIDTH_SECONDS'].to_numpy(dtype=float)
+                    fig_dist.add_trace(go.Bar(
+                        x=buckets['BUCKET_START_SECONDS'].to_numpy(dtype=float) + bucket_width / 2,
+                        y=buckets['QUERY_COUNT'].to_numpy(),
+                        width=bucket_width,
+                        name=workload_type
+                    ))
+                fig_dist.update_layout(
+                    title='Execution Time Distribution',
+                    xaxis_title='Execution Time (s)',
+                    yaxis_title='Count',
+                    barmode='stack',
+                    height=400
+                )
+                st.plotly_chart(fig_dist, use_container_width=True)
             
             # Queue analysis
-            queued_queries = query_perf[query_perf['QUEUE_TIME_SECONDS'] > 0]
+            queue_times = data['queue_times']
+            queued_queries = queue_times[queue_times['QUEUE_TIME_SECONDS'] > 0] if not queue_times.empty else queue_times
             if not queued_queries.empty:
                 st.warning(f"⚠️ {len(queued_queries)} queries experienced queuing delays")
                 st.dataframe(
-                    queued_queries[['QUERY_ID', 'WORKLOAD_TYPE', 'EXECUTION_TIME_SECONDS', 'QUEUE_TIME_SECONDS']].head(10),
+                    queued_queries.head(10),
                     use_container_width=True
                 )
         else:
@@ -449,65 +634,70 @@ def main():
     with tab4:
         st.header("Optimization Recommendations")
         
-        # Fetch data for analysis
-        wh_metrics = get_warehouse_metrics(time_window)
-        wh_load = get_warehouse_load(time_window)
-        cost_by_workload = get_cost_by_workload(time_window)
-        query_perf = get_query_performance(time_window)
+        # Derive each check from the (already aggregated) results fetched for Tabs 1-3
+        wh_metrics = data['wh_metrics']
+        wh_load = data['wh_load']
+        cost_by_workload = data['cost_by_workload']
+        perf_summary = data['perf_summary']
+        
+        max_queued = wh_load['AVG_QUEUED_QUERIES'].max() if not wh_load.empty else None
+        
+        # Metering rows exist only for hours the warehouse ran, so measure them against
+        # every hour in the window rather than against the number of rows returned
+        utilization = None
+        if not wh_metrics.empty:
+            active_hours = (wh_metrics['TOTAL_CREDITS'] > 0).sum()
+            utilization = (active_hours / (time_window * 24)) * 100
+        
+        slow_query_count = perf_summary['SLOW_QUERY_COUNT'].sum() if not perf_summary.empty else None
+        
+        untagged_pct = None
+        if not cost_by_workload.empty:
+            workload_costs = cost_by_workload.groupby('WORKLOAD_TYPE')['TOTAL_CREDITS'].sum()
+            if 'UNTAGGED' in workload_costs.index and workload_costs.sum() > 0:
+                untagged_pct = (workload_costs['UNTAGGED'] / workload_costs.sum()) * 100
         
         recommendations = []
         
         # Analyze queuing
-        if not wh_load.empty:
-            max_queued = wh_load['AVG_QUEUED_QUERIES'].max()
-            if max_queued > 2:
-                recommendations.append({
-                    'priority': 'HIGH',
-                    'category': 'Performance',
-                    'issue': 'Significant query queuing detected',
-                    'recommendation': f'Peak queued queries: {max_queued:.1f}. Consider scaling up warehouse size or enabling multi-cluster warehouses.',
-                    'action': 'ALTER WAREHOUSE SFE_SP_WH SET WAREHOUSE_SIZE = LARGE;'
-                })
+        if pd.notna(max_queued) and max_queued > 2:
+            recommendations.append({
+                'priority': 'HIGH',
+                'category': 'Performance',
+                'issue': 'Significant query queuing detected',
+                'recommendation': f'Peak queued queries: {max_queued:.1f}. Consider scaling up warehouse size or enabling multi-cluster warehouses.',
+                'action': 'ALTER WAREHOUSE SFE_SP_WH SET WAREHOUSE_SIZE = LARGE;'
+            })
         
         # Analyze idle time
-        if not wh_metrics.empty:
-            total_hours = len(wh_metrics)
-            active_hours = len(wh_metrics[wh_metrics['EXECUTION_COUNT'] > 0])
-            if total_hours > 0:
-                utilization = (active_hours / total_hours) * 100
-                if utilization < 30:
-                    recommendations.append({
-                        'priority': 'MEDIUM',
-                        'category': 'Cost',
-                        'issue': f'Low warehouse utilization ({utilization:.1f}%)',
-                        'recommendation': 'Consider reducing auto-suspend timeout or consolidating workloads to reduce idle time.',
-                        'action': 'ALTER WAREHOUSE SFE_SP_WH SET AUTO_SUSPEND = 30;'
-                    })
+        if pd.notna(utilization) and utilization < 30:
+            recommendations.append({
+                'priority': 'MEDIUM',
+                'category': 'Cost',
+                'issue': f'Low warehouse utilization ({utilization:.1f}%)',
+                'recommendation': 'Consider reducing auto-suspend timeout or consolidating workloads to reduce idle time.',
+                'action': 'ALTER WAREHOUSE SFE_SP_WH SET AUTO_SUSPEND = 30;'
+            })
         
         # Analyze slow queries
-        if not query_perf.empty:
-            slow_queries = query_perf[query_perf['EXECUTION_TIME_SECONDS'] > 300]
-            if len(slow_queries) > 0:
-                recommendations.append({
-                    'priority': 'MEDIUM',
-                    'category': 'Performance',
-                    'issue': f'{len(slow_queries)} queries taking over 5 minutes',
-                    'recommendation': 'Review slow queries for optimization opportunities (see Query Analysis tab).',
-                    'action': 'Check query execution plans and consider adding clustering keys or materialized views.'
-                })
+        if pd.notna(slow_query_count) and slow_query_count > 0:
+            recommendations.append({
+                'priority': 'MEDIUM',
+                'category': 'Performance',
+                'issue': f'{int(slow_query_count)} queries taking over 5 minutes',
+                'recommendation': 'Review slow queries for optimization opportunities (see Query Analysis tab).',
+                'action': 'Check query execution plans and consider adding clustering keys or materialized views.'
+            })
         
         # Analyze cost distribution
-        if not cost_by_workload.empty:
-            workload_costs = cost_by_workload.groupby('WORKLOAD_TYPE')['TOTAL_CREDITS'].sum()
-            if 'UNTAGGED' in workload_costs.index and workload_costs['UNTAGGED'] > 0:
-                untagged_pct = (workload_costs['UNTAGGED'] / workload_costs.sum()) * 100
-                recommendations.append({
-                    'priority': 'LOW',
-                    'category': 'Monitoring',
-                    'issue': f'{untagged_pct:.1f}% of queries are untagged',
-                    'recommendation': 'Add query tags to all forecasting workloads for better cost attribution.',
-                    'action': "ALTER SESSION SET QUERY_TAG = 'WORKLOAD:type|PATH:approach';"
-                })
+        if pd.notna(untagged_pct) and untagged_pct > 0:
+            recommendations.append({
+                'priority': 'LOW',
+                'category': 'Monitoring',
+                'issue': f'{untagged_pct:.1f}% of queries are untagged',
+                'recommendation': 'Add query tags to all forecasting workloads for better cost attribution.',
+                'action': "ALTER SESSION SET QUERY_TAG = 'WORKLOAD:type|PATH:approach';"
+            })
         
         # Display recommendations
         if recommendations: